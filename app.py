@@ -1,7 +1,6 @@
 import streamlit as st
 import subprocess
 import sys
-import time
 import os
 import shutil
 import re
@@ -10,6 +9,10 @@ from datetime import datetime
 from pathlib import Path
 import zipfile
 import io
+import functools
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Configure page
 st.set_page_config(
@@ -19,12 +22,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Patterns used to pick generated file paths out of script output
+_FILE_RE = re.compile(
+    r'Generated report for.*?: (?P<pdf>.*?\.pdf)'
+    r'|Data (?:successfully|already) saved to (?P<data>.*?\.(?:csv|parquet|feather))'
+)
+
 def get_temp_dir():
     """Create and get temporary directory"""
     if 'temp_dir' not in st.session_state:
         st.session_state.temp_dir = tempfile.mkdtemp()
     return st.session_state.temp_dir
 
+@functools.lru_cache(maxsize=256)
 def validate_symbol(symbol):
     """Validate the input symbol"""
     if not symbol:
@@ -37,16 +47,10 @@ def validate_symbol(symbol):
     return symbol
 
 def extract_file_paths(output):
-    """Extract file paths from script output"""
-    pdf_pattern = r'Generated report for.*?: (.*?\.pdf)'
-    csv_pattern = r'Data successfully saved to (.*?\.csv)'
-    
+    """Extract file paths from script output in a single pass"""
     files = []
-    pdf_matches = re.findall(pdf_pattern, output)
-    files.extend(pdf_matches)
-    csv_matches = re.findall(csv_pattern, output)
-    files.extend(csv_matches)
-    
+    for match in _FILE_RE.finditer(output):
+        files.append(match.group('pdf') or match.group('data'))
     return files
 
 def cleanup_temp_files(temp_dir):
@@ -54,6 +58,8 @@ def cleanup_temp_files(temp_dir):
     try:
         shutil.rmtree(temp_dir)
         st.session_state.temp_dir = tempfile.mkdtemp()
+        # Cached script outputs point into the directory just removed
+        st.cache_data.clear()
     except Exception as e:
         st.error(f"Error cleaning up temporary files: {str(e)}")
 
@@ -63,33 +69,61 @@ def create_zip_file(files, symbol):
         zip_buffer = io.BytesIO()
         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
             for file_path in files:
-                if os.path.exists(file_path):
-                    # Get just the filename for the zip
-                    file_name = os.path.basename(file_path)
-                    # Add file to zip
-                    zip_file.write(file_path, file_name)
+                # Get just the filename for the zip
+                file_name = os.path.basename(file_path)
+                # PDFs, Parquet and Feather are already compressed; store them as-is and deflate the CSVs
+                if file_name.endswith(('.pdf', '.parquet', '.feather')):
+                    compress_type = zipfile.ZIP_STORED
+                else:
+                    compress_type = zipfile.ZIP_DEFLATED
+                # Add file to zip; a missing file fails the stat inside write()
+                try:
+                    zip_file.write(file_path, file_name, compress_type=compress_type)
+                except OSError as e:
+                    st.error(f"Error adding {file_name} to zip file: {str(e)}")
         return zip_buffer
     except Exception as e:
         st.error(f"Error creating zip file: {str(e)}")
         return None
 
-@st.cache_data(show_spinner=False)
-def execute_script(script_name, symbol):
-    """Execute a Python script with caching"""
+@st.cache_data(show_spinner=False, ttl=1800)
+def execute_script(script_name, symbol, _analysis_dir, _line_queue=None):
+    """Execute a Python script with caching
+
+    Cached on (script_name, symbol) only; the leading underscores keep
+    _analysis_dir and _line_queue out of the cache key. Each stdout line is
+    put on _line_queue as (script_name, line) so the main thread can show it.
+    """
     try:
-        # Set environment variables for scripts
-        temp_dir = get_temp_dir()
-        analysis_dir = os.path.join(temp_dir, symbol)
-        os.makedirs(analysis_dir, exist_ok=True)
-        os.environ['ANALYSIS_OUTPUT_DIR'] = analysis_dir
+        # Point the script at the output dir without touching our own environment.
+        # Unbuffered, or the child holds its print output until it exits
+        env = {**os.environ, 'ANALYSIS_OUTPUT_DIR': _analysis_dir, 'PYTHONUNBUFFERED': '1'}
+        
+        # Stream stdout line by line; stderr goes to a temp file so a chatty
+        # child can never block on a full pipe while we read stdout
+        output_lines = []
+        with tempfile.TemporaryFile(mode='w+') as stderr_file:
+            with subprocess.Popen(
+                [sys.executable, script_name, symbol],
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                env=env,
+                text=True,
+                bufsize=1
+            ) as proc:
+                for line in proc.stdout:
+                    output_lines.append(line)
+                    if _line_queue is not None:
+                        _line_queue.put((script_name, line))
+                returncode = proc.wait()
+            
+            if returncode != 0:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, proc.args, stderr=stderr_file.read()
+                )
         
-        result = subprocess.run(
-            [sys.executable, script_name, symbol],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return True, result.stdout
+        return True, ''.join(output_lines)
         
     except subprocess.CalledProcessError as e:
         error_msg = f"Error executing {script_name}:\nExit code: {e.returncode}\nError output: {e.stderr}"
@@ -139,27 +173,64 @@ def main():
             ]
             
             success_count = 0
-            outputs = []
+            results = {}
             all_files = []
             
-            for idx, script in enumerate(scripts):
-                status_container.info(f"Running {script}...")
-                success, output = execute_script(script, symbol)
-                
-                if success:
-                    success_count += 1
-                    if debug_mode:
-                        st.success(f"✅ {script} completed successfully")
-                    files = extract_file_paths(output)
-                    all_files.extend(files)
-                else:
-                    st.error(f"❌ {script} failed")
-                    if debug_mode:
-                        st.code(output)
-                
-                outputs.append(output)
-                progress_bar.progress((idx + 1) / len(scripts))
-                time.sleep(0.5)
+            analysis_dir = os.path.join(get_temp_dir(), symbol)
+            os.makedirs(analysis_dir, exist_ok=True)
+            
+            # Scripts are independent, so run them side by side; attach the
+            # script run context so cached calls run as part of this session
+            status_container.info(f"Running {len(scripts)} scripts for {symbol}...")
+            ctx = get_script_run_ctx()
+            # Workers can't draw on the page, so their output lines come back
+            # through a queue that this thread drains while it waits
+            line_queue = queue.Queue()
+            output_placeholder = st.empty()
+            done = 0
+            with ThreadPoolExecutor(max_workers=len(scripts),
+                                    initializer=add_script_run_ctx,
+                                    initargs=(None, ctx)) as executor:
+                futures = {
+                    executor.submit(execute_script, script, symbol, analysis_dir, line_queue): script
+                    for script in scripts
+                }
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    
+                    latest = None
+                    while True:
+                        try:
+                            latest = line_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                    if latest:
+                        output_placeholder.text(f"[{latest[0]}] {latest[1].rstrip()}")
+                    
+                    for future in finished:
+                        done += 1
+                        script = futures[future]
+                        success, output = future.result()
+                        
+                        if success:
+                            success_count += 1
+                            if debug_mode:
+                                st.success(f"✅ {script} completed successfully")
+                            files = extract_file_paths(output)
+                            all_files.extend(files)
+                        else:
+                            st.error(f"❌ {script} failed")
+                            if debug_mode:
+                                st.code(output)
+                        
+                        results[script] = output
+                        progress_bar.progress(done / len(scripts))
+                        status_container.info(f"Finished {script} ({done}/{len(scripts)})")
+            
+            output_placeholder.empty()
+            
+            outputs = [results[script] for script in scripts]
             
             # Process and display results
             if success_count == len(scripts):
@@ -1,19 +1,40 @@
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
+import numpy as np
 from datetime import datetime
 import logging
 import json
 import os
 import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import PageBreak
-from io import StringIO
+
+# Paragraph styles are shared by every scraper instance, so build them once at import
+_STYLES = getSampleStyleSheet()
+if 'CustomTitle' not in _STYLES:
+    _STYLES.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=_STYLES['Heading1'],
+        fontSize=16,
+        spaceAfter=30
+    ))
+if 'SectionHeader' not in _STYLES:
+    _STYLES.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=_STYLES['Heading2'],
+        fontSize=14,
+        spaceAfter=20
+    ))
 
 class ScreenerScraper:
     def __init__(self):
@@ -25,20 +46,49 @@ class ScreenerScraper:
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
         self.logger = logging.getLogger(__name__)
-        self.styles = getSampleStyleSheet()
-        # Create custom styles
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30
-        ))
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=20
-        ))
+        # Cache fetched pages on disk so repeat runs within the hour skip the request
+        self.session = requests_cache.CachedSession(
+            cache_name='screener',
+            backend='sqlite',
+            use_cache_dir=True,
+            expire_after=3600
+        )
+        # Keep-alive connection reuse with backoff on transient failures
+        retries = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.session.headers.update(self.headers)
+        # Table styles are identical for every table, so build them once
+        self._metrics_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self._section_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        self.styles = _STYLES
 
     def get_folder_path(self, company_code):
         """Create folder based on company code if it doesn't exist"""
@@ -47,7 +97,7 @@ class ScreenerScraper:
         
         if not os.path.exists(folder_path):
             try:
-                os.makedirs(folder_path)
+                os.makedirs(folder_path, exist_ok=True)
                 self.logger.info(f"Created new folder: {folder_path}")
             except Exception as e:
                 self.logger.error(f"Error creating folder: {str(e)}")
@@ -57,7 +107,9 @@ class ScreenerScraper:
             
         return folder_path
 
-    def validate_company_code(self, company_code):
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def validate_company_code(company_code):
         """Validate the company code format"""
         if not company_code:
             raise ValueError("Company code cannot be empty")
@@ -68,65 +120,59 @@ class ScreenerScraper:
         return company_code.upper()
 
     def get_page_content(self, url):
-        """Fetch page content with retry mechanism"""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(url, headers=self.headers)
-                response.raise_for_status()
-                return response.text
-            except requests.RequestException as e:
-                self.logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                else:
-                    raise
+        """Fetch raw page bytes, retrying transient failures via the session adapter"""
+        try:
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+            # Hand bytes to the parser and let lxml detect the encoding
+            return response.content
+        except requests.RequestException as e:
+            self.logger.error(f"Failed to fetch {url}: {str(e)}")
+            raise
 
     def extract_key_metrics(self, soup):
         """Extract key metrics from the top section"""
         metrics = {}
-        metrics_section = soup.find('div', class_='company-ratios')
-        if metrics_section:
-            for item in metrics_section.find_all('li'):
-                label = item.find('span', class_='name')
-                value = item.find('span', class_='number')
-                if label and value:
-                    metrics[label.text.strip()] = value.text.strip()
+        for item in soup.select('div.company-ratios li'):
+            label = item.select_one('span.name')
+            value = item.select_one('span.number')
+            if label and value:
+                metrics[label.get_text(strip=True)] = value.get_text(strip=True)
         return metrics
 
     def extract_company_info(self, soup):
         """Extract company information"""
         info = {}
-        company_name = soup.find('h1', class_='company-name')
+        company_name = soup.select_one('h1.company-name')
         if company_name:
-            info['Company Name'] = company_name.text.strip()
+            info['Company Name'] = company_name.get_text(strip=True)
 
-        description = soup.find('div', class_='about')
+        description = soup.select_one('div.about')
         if description:
-            info['Description'] = description.text.strip()
+            # Join nested paragraphs with a space so words are not glued together
+            info['Description'] = description.get_text(' ', strip=True)
 
         return info
 
     def extract_table_data(self, table):
-        """Extract data from a specific table with improved column handling"""
+        """Extract data from a specific table, keeping every cell as the page's text"""
         if not table:
             return None
 
-        headers = []
-        header_row = table.find('tr')
-        if header_row:
-            headers = [th.text.strip() for th in header_row.find_all(['th', 'td'])]
+        # The first row is the header whether it uses <th> or <td> cells
+        rows = table.find_all('tr')
+        if not rows:
+            return None
+        headers = [cell.text.strip() for cell in rows[0].find_all(['th', 'td'])]
+        width = len(headers)
 
         rows_data = []
-        data_rows = table.find_all('tr')[1:]
-        
-        for row in data_rows:
+        for row in rows[1:]:
             cells = row.find_all(['td', 'th'])
             if cells:
-                row_data = [cell.text.strip() for cell in cells]
-                while len(row_data) < len(headers):
-                    row_data.append('')
-                rows_data.append(row_data[:len(headers)])
+                row_data = [cell.text.strip() for cell in cells[:width]]
+                row_data.extend([''] * (width - len(row_data)))
+                rows_data.append(row_data)
 
         if headers and rows_data:
             try:
@@ -144,12 +190,12 @@ class ScreenerScraper:
         data['Company_Info'] = self.extract_company_info(soup)
         data['Key_Metrics'] = self.extract_key_metrics(soup)
 
-        for section in soup.find_all('section'):
+        for section in soup.select('section'):
             section_id = section.get('id', '')
             section_title = section.find('h2')
             title = section_title.text.strip() if section_title else section_id
 
-            tables = section.find_all('table')
+            tables = section.select('table')
             if tables:
                 section_data = {}
                 for i, table in enumerate(tables):
@@ -177,31 +223,23 @@ class ScreenerScraper:
         return data
 
     def create_pdf_table(self, data, style=None):
-        """Convert data to a format suitable for PDF tables"""
+        """Convert data to a list of string rows ready for a PDF Table"""
         if isinstance(data, pd.DataFrame):
-            # Convert DataFrame to list of lists
-            table_data = [data.columns.tolist()] + data.values.tolist()
+            # Stringify the whole grid in one vectorized pass, blanking missing cells
+            header = [str(col) for col in data.columns]
+            arr = data.to_numpy(dtype=object, copy=False)
+            table_data = [header] + np.where(pd.isna(arr), '', arr.astype(str)).tolist()
         elif isinstance(data, dict):
-            # Convert dictionary to list of lists
-            table_data = [[key, str(value)] for key, value in data.items()]
+            # Convert dictionary to list of lists of strings
+            table_data = [
+                [str(key), '' if value is None else str(value)]
+                for key, value in data.items()
+            ]
         else:
             return None
 
         return table_data
 
-    def format_table_for_pdf(self, table_data):
-        """Format table data for PDF, handling large tables"""
-        if not table_data:
-            return None
-        
-        # Convert all elements to strings and handle None values
-        formatted_data = []
-        for row in table_data:
-            formatted_row = [str(cell) if cell is not None else '' for cell in row]
-            formatted_data.append(formatted_row)
-        
-        return formatted_data
-
     def generate_pdf(self, data, folder_path, company_code):
         """Generate PDF report from scraped data"""
         # Create filename with timestamp
@@ -232,21 +270,8 @@ class ScreenerScraper:
             story.append(Paragraph('Key Metrics', self.styles['SectionHeader']))
             metrics_table = self.create_pdf_table(data['Key_Metrics'])
             if metrics_table:
-                formatted_table = self.format_table_for_pdf(metrics_table)
-                t = Table(formatted_table)
-                t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
+                t = Table(metrics_table)
+                t.setStyle(self._metrics_style)
                 story.append(t)
                 story.append(Spacer(1, 20))
 
@@ -262,21 +287,8 @@ class ScreenerScraper:
                             story.append(Paragraph(f"{key}", self.styles['Normal']))
                             table_data = self.create_pdf_table(value)
                             if table_data:
-                                formatted_table = self.format_table_for_pdf(table_data)
-                                t = Table(formatted_table)
-                                t.setStyle(TableStyle([
-                                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                                ]))
+                                t = Table(table_data)
+                                t.setStyle(self._section_style)
                                 story.append(t)
                                 story.append(Spacer(1, 20))
 
@@ -298,7 +310,7 @@ class ScreenerScraper:
             self.logger.info(f"Starting scraping for company: {company_code}")
             
             html_content = self.get_page_content(url)
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, 'lxml')
             data = self.parse_screener_data(soup)
             
             # Generate PDF
@@ -320,13 +332,19 @@ def main():
 
     scraper = ScreenerScraper()
     
-    for company_code in args.companies:
-        try:
-            pdf_file = scraper.scrape_company(company_code)
-            print(f"Generated report for {company_code}: {pdf_file}")
-        except Exception as e:
-            print(f"Failed to generate report for {company_code}: {str(e)}")
-            continue
+    # One scraper (and its session) is shared; companies are fetched and rendered concurrently
+    with ThreadPoolExecutor(max_workers=min(8, len(args.companies))) as executor:
+        futures = [
+            (company_code, executor.submit(scraper.scrape_company, company_code))
+            for company_code in args.companies
+        ]
+        for company_code, future in futures:
+            try:
+                pdf_file = future.result()
+                print(f"Generated report for {company_code}: {pdf_file}")
+            except Exception as e:
+                print(f"Failed to generate report for {company_code}: {str(e)}")
+                continue
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
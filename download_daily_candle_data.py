@@ -1,153 +1,416 @@
-import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta
 import sys
 import os
 import argparse
+import functools
+import threading
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-class NSEDataDownloader:
-    def __init__(self):
-        # Hardcoded number of years
-        self.years = 3
-        
-    def setup_folder(self, symbol):
-        """
-        Create folder based on symbol name if it doesn't exist
-        
-        Parameters:
-        symbol (str): Stock symbol
-        
-        Returns:
-        str: Absolute path to the folder
-        """
-        folder_name = symbol.upper()
-        folder_path = os.path.abspath(folder_name)
-        
-        if not os.path.exists(folder_path):
-            try:
-                os.makedirs(folder_path)
-                print(f"Created new folder: {folder_path}")
-            except Exception as e:
-                raise Exception(f"Error creating folder: {str(e)}")
+# yfinance, pandas and numpy are imported where they are used so that
+# --help and argument errors do not pay their import cost
+
+# Hardcoded number of years
+YEARS = 3
+# Symbols per yf.download call; long ticker lists overflow Yahoo's URL limit
+BATCH_SIZE = 20
+# yf.download keeps results and errors in module-level state, so only one call may run at a time
+_DOWNLOAD_LOCK = threading.Lock()
+# Seconds to wait before retrying a batch, plus up to as much again in jitter
+_RETRY_DELAY = 5
+# Price columns rounded to 2 decimals; a list because a tuple would index a single column
+_PRICE_COLS = ['Open', 'High', 'Low', 'Close']
+# Volumes are stored as int32 when they fit (max 2,147,483,647)
+_INT32_MAX = 2**31 - 1
+
+def _is_missing_data(error):
+    """
+    Tell whether a ticker error recorded by yf.download means Yahoo has no data for it
+    
+    Every yfinance release words its unknown-symbol and no-price-data errors as
+    "possibly delisted"; anything else (rate limits, network errors) is worth
+    asking for again.
+    
+    Parameters:
+    error (str): Error message from yfinance's shared error store
+    
+    Returns:
+    bool: True if the ticker should not be retried
+    """
+    return 'delisted' in error.lower()
+
+def _download_batch(nse_symbols, start_str, end_str):
+    """
+    Download several NSE tickers in one yf.download call
+    
+    Parameters:
+    nse_symbols (list): NSE stock symbols with .NS suffix
+    start_str (str): First date to download, YYYY-MM-DD
+    end_str (str): Last date to download, YYYY-MM-DD
+    
+    Returns:
+    tuple: (frames, failed) - non-empty DataFrame per NSE symbol that returned data and
+    the error yfinance recorded per NSE symbol that failed
+    """
+    import yfinance as yf
+    from yfinance import shared
+    import pandas as pd
+    
+    with _DOWNLOAD_LOCK:
+        data = yf.download(
+            tickers=" ".join(nse_symbols),
+            start=start_str,
+            end=end_str,
+            interval='1d',  # Changed from '1wk' to '1d' for daily data
+            group_by='ticker',
+            actions=True,
+            auto_adjust=True,
+            threads=True,
+            progress=False
+        )
+        # Per-ticker failures are recorded here rather than raised; read them
+        # before the next call resets them
+        failed = {
+            symbol: str(error)
+            for symbol, error in getattr(shared, '_ERRORS', {}).items()
+            if symbol in nse_symbols
+        }
+        
+    frames = {}
+    for nse_symbol in nse_symbols:
+        # Older yfinance returns flat columns when only one ticker is requested
+        if isinstance(data.columns, pd.MultiIndex):
+            if nse_symbol not in data.columns.get_level_values(0):
+                continue
+            df = data[nse_symbol].dropna(how='all')
         else:
-            print(f"Using existing folder: {folder_path}")
+            df = data.dropna(how='all')
+        if not df.empty:
+            frames[nse_symbol] = df
             
-        return folder_path
+    return frames, failed
+
+def get_date_range(years):
+    """
+    Format the download date range and file stamp once for a run
+    
+    Parameters:
+    years (int): Number of years of history to download
+    
+    Returns:
+    tuple: (start_str, end_str, stamp) as YYYY-MM-DD, YYYY-MM-DD and YYYYMMDD
+    """
+    now = datetime.now()
+    start_str = (now - timedelta(days=years*365)).strftime('%Y-%m-%d')
+    return start_str, now.strftime('%Y-%m-%d'), now.strftime('%Y%m%d')
 
-    def validate_symbol(self, symbol):
-        """
-        Validate if the symbol exists on NSE
+@functools.lru_cache(maxsize=None)
+def setup_folder(symbol):
+    """
+    Create folder based on symbol name if it doesn't exist
+    
+    Memoized, so each symbol's folder is created (and reported) once per run.
+    
+    Parameters:
+    symbol (str): Stock symbol
+    
+    Returns:
+    str: Absolute path to the folder
+    """
+    folder_path = os.path.abspath(symbol.upper())
+    try:
+        os.makedirs(folder_path, exist_ok=True)
+    except Exception as e:
+        raise Exception(f"Error creating folder: {str(e)}")
+    print(f"Using folder: {folder_path}")
+    return folder_path
+
+def get_file_path(base_symbol, years, stamp, output_format):
+    """
+    Build the path of today's data file for a symbol
+    
+    The folder is not created here; save_candlestick_data creates it once there is
+    data to write, so unknown or failed symbols leave no empty folders behind.
+    
+    Parameters:
+    base_symbol (str): Original stock symbol for file naming
+    years (int): Number of years of history in the file
+    stamp (str): YYYYMMDD date stamp for the file name
+    output_format (str): 'parquet', 'feather' or 'csv'
+    
+    Returns:
+    str: Absolute path to the data file
+    """
+    folder_path = os.path.abspath(base_symbol.upper())
+    filename = f"NSE_{base_symbol}_daily_{years}years_{stamp}.{output_format}"  # Changed 'weekly' to 'daily'
+    return os.path.join(folder_path, filename)
+
+def load_saved_data(file_path, output_format):
+    """
+    Load a data file if an earlier run already wrote it
+    
+    Parameters:
+    file_path (str): Path from get_file_path
+    output_format (str): 'parquet', 'feather' or 'csv'
+    
+    Returns:
+    pandas.DataFrame: Saved data, or None if there is no non-empty file yet
+    """
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return None
         
-        Parameters:
-        symbol (str): Stock symbol
+    import pandas as pd
+    
+    if output_format == 'parquet':
+        df = pd.read_parquet(file_path, engine='pyarrow')
+    elif output_format == 'feather':
+        df = pd.read_feather(file_path)
+    else:
+        df = pd.read_csv(file_path, parse_dates=['Date'])
+    print(f"Data already saved to {file_path}")
+    return df
+
+def validate_symbol(symbol):
+    """
+    Build the NSE ticker for a symbol
+    
+    Existence is not probed here; an empty download result marks an unknown symbol.
+    
+    Parameters:
+    symbol (str): Stock symbol
+    
+    Returns:
+    tuple: (nse_symbol, base_symbol)
+    """
+    base_symbol = symbol.upper()
+    nse_symbol = f"{base_symbol}.NS"
+    return nse_symbol, base_symbol
+
+def download_candlestick_data(base_symbols, start_str, end_str):
+    """
+    Download daily candlestick data for several NSE symbols in one request
+    
+    Parameters:
+    base_symbols (list): Stock symbols without the .NS suffix
+    start_str (str): First date to download, YYYY-MM-DD
+    end_str (str): Last date to download, YYYY-MM-DD
+    
+    Returns:
+    tuple: (frames, errors) - raw DataFrame per base symbol (empty if Yahoo has no data
+    for it) and an error message per base symbol whose download kept failing
+    """
+    import pandas as pd
+    
+    print(f"Downloading daily data for {', '.join(base_symbols)} from NSE...")
+    
+    nse_symbols = [validate_symbol(symbol)[0] for symbol in base_symbols]
+    
+    try:
+        frames, failed = _download_batch(nse_symbols, start_str, end_str)
         
-        Returns:
-        tuple: (nse_symbol, base_symbol)
-        """
-        base_symbol = symbol.upper()
-        nse_symbol = f"{base_symbol}.NS"
+        # Ask again once, in one batch, for tickers that failed transiently. When the
+        # whole batch came back empty the request itself may have been throttled,
+        # so also include tickers without a recorded error. Missing data is final
+        retry_symbols = [
+            symbol for symbol in nse_symbols
+            if symbol not in frames
+            and (symbol in failed or not frames)
+            and not _is_missing_data(failed.get(symbol, ''))
+        ]
+        if retry_symbols:
+            # Back off outside the lock so other batches are not held up
+            time.sleep(_RETRY_DELAY * (1 + random.random()))
+            for symbol in retry_symbols:
+                failed.pop(symbol, None)
+            retried, retry_failed = _download_batch(retry_symbols, start_str, end_str)
+            frames.update(retried)
+            failed.update(retry_failed)
+    except Exception as e:
+        raise Exception(f"Error downloading data: {str(e)}")
+    
+    results = {}
+    errors = {}
+    for nse_symbol, base_symbol in zip(nse_symbols, base_symbols):
+        if nse_symbol in frames:
+            results[base_symbol] = frames[nse_symbol]
+        elif nse_symbol in failed and not _is_missing_data(failed[nse_symbol]):
+            errors[base_symbol] = f"Error downloading data: {failed[nse_symbol]}"
+        else:
+            results[base_symbol] = pd.DataFrame()
         
-        try:
-            ticker = yf.Ticker(nse_symbol)
-            test_data = ticker.history(period="1d")
-            if test_data.empty:
-                raise Exception(f"Could not find data for {base_symbol} on NSE")
-            return nse_symbol, base_symbol
-        except Exception as e:
-            raise Exception(f"Error validating symbol {base_symbol}: {str(e)}")
+    return results, errors
 
-    def download_candlestick_data(self, nse_symbol, base_symbol):
-        """
-        Download daily candlestick data for a given NSE symbol
+def save_candlestick_data(df, base_symbol, file_path, output_format):
+    """
+    Clean downloaded candlestick data and save it to the symbol's folder
+    
+    Parameters:
+    df (pandas.DataFrame): Raw data for one symbol from download_candlestick_data
+    base_symbol (str): Original stock symbol for the Symbol column
+    file_path (str): Path from get_file_path
+    output_format (str): 'parquet', 'feather' or 'csv'
+    
+    Returns:
+    pandas.DataFrame: DataFrame containing the candlestick data
+    """
+    if df is None or df.empty:
+        raise Exception(f"Could not find data for {base_symbol} on NSE")
+    
+    import numpy as np
+    import pandas as pd
+    
+    setup_folder(base_symbol)
         
-        Parameters:
-        nse_symbol (str): NSE stock symbol with .NS suffix
-        base_symbol (str): Original stock symbol for file naming
+    try:
+        # Clean and format the data
+        # yf.download column order varies by version, so select by name
+        df = df.reindex(columns=['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits'], fill_value=0)
+        df = df.reset_index()
+        df.columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
         
-        Returns:
-        pandas.DataFrame: DataFrame containing the candlestick data
-        """
-        print(f"Downloading daily data for {base_symbol} from NSE...")
+        # Round the prices to 2 decimal places in one ufunc pass over the price block
+        df[_PRICE_COLS] = np.round(df[_PRICE_COLS].to_numpy(dtype=np.float64), 2)
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=self.years*365)
+        # Convert volume to integer, treating missing volume as zero. int32 halves the
+        # column but caps at ~2.1B, which heavily traded stocks can exceed in a week
+        volume = np.nan_to_num(df['Volume'].to_numpy(dtype=np.float64))
+        volume_dtype = np.int32 if volume.max(initial=0) <= _INT32_MAX else np.int64
+        df['Volume'] = volume.astype(volume_dtype)
         
-        try:
-            # Create folder for this symbol
-            folder_path = self.setup_folder(base_symbol)
-            
-            ticker = yf.Ticker(nse_symbol)
-            df = ticker.history(
-                start=start_date.strftime('%Y-%m-%d'),
-                end=end_date.strftime('%Y-%m-%d'),
-                interval='1d'  # Changed from '1wk' to '1d' for daily data
-            )
-            
-            if df.empty:
-                raise Exception("No data was downloaded")
-                
-            # Clean and format the data
-            df = df.reset_index()
-            df.columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
-            
-            # Round the prices to 2 decimal places
-            price_columns = ['Open', 'High', 'Low', 'Close']
-            df[price_columns] = df[price_columns].round(2)
-            
-            # Convert volume to integer
-            df['Volume'] = df['Volume'].astype(int)
-            
-            # Add symbol column
-            df.insert(0, 'Symbol', base_symbol)
-            
-            # Create filename and full path
-            filename = f"NSE_{base_symbol}_daily_{self.years}years_{datetime.now().strftime('%Y%m%d')}.csv"  # Changed 'weekly' to 'daily'
-            file_path = os.path.join(folder_path, filename)
-            
-            # Save to CSV
+        # Add symbol column as a one-category categorical: an int8 code per row
+        df.insert(0, 'Symbol', pd.Categorical.from_codes(
+            np.zeros(len(df), dtype=np.int8), categories=[base_symbol]
+        ))
+        
+        # Save in the requested format; Parquet and Feather keep Date as a native timestamp
+        if output_format == 'parquet':
+            df.to_parquet(file_path, engine='pyarrow', compression='snappy', index=False)
+        elif output_format == 'feather':
+            # Arrow IPC is the fastest write: columnar buffers go to disk almost as-is
+            df.reset_index(drop=True).to_feather(file_path, compression='zstd')
+        else:
             df.to_csv(file_path, index=False)
-            print(f"Data successfully saved to {file_path}")
-            
-            return df
-            
-        except Exception as e:
-            raise Exception(f"Error downloading data: {str(e)}")
-
-    def display_data_summary(self, df, symbol):
-        """
-        Display summary of the downloaded data
-        """
-        if df is not None and not df.empty:
-            print(f"\nSummary for {symbol}:")
-            print("\nFirst few rows of the downloaded data:")
-            print(df.head())
-            
-            print("\nBasic statistics:")
-            stats = df[['Open', 'High', 'Low', 'Close', 'Volume']].describe()
-            pd.set_option('display.float_format', lambda x: '%.2f' % x)
+        print(f"Data successfully saved to {file_path}")
+        
+        return df
+        
+    except Exception as e:
+        raise Exception(f"Error saving data: {str(e)}")
+
+def display_data_summary(df, symbol):
+    """
+    Display summary of the downloaded data
+    """
+    import pandas as pd
+    
+    if df is not None and not df.empty:
+        print(f"\nSummary for {symbol}:")
+        print("\nFirst few rows of the downloaded data:")
+        print(df.head())
+        
+        print("\nBasic statistics:")
+        stats = df[['Open', 'High', 'Low', 'Close', 'Volume']].describe()
+        with pd.option_context('display.float_format', lambda x: '%.2f' % x):
             print(stats)
+        
+        print(f"\nDate range: {df['Date'].min()} to {df['Date'].max()}")
+        print(f"Total number of trading days: {len(df)}")  # Changed weeks to trading days
+
+def _process_batch(batch, years, start_str, end_str, stamp, output_format, force):
+    """
+    Download and save one batch of symbols, reusing files already written today
+    
+    Parameters:
+    batch (list): Base symbols fetched together in one request
+    years (int): Number of years of history in the file names
+    start_str (str): First date to download, YYYY-MM-DD
+    end_str (str): Last date to download, YYYY-MM-DD
+    stamp (str): YYYYMMDD date stamp for the file names
+    output_format (str): 'parquet', 'feather' or 'csv'
+    force (bool): Download again even if today's file already exists
+    
+    Returns:
+    list: (symbol, DataFrame or None, error message or None) per symbol
+    """
+    results = []
+    pending = {}
+    for symbol in batch:
+        try:
+            file_path = get_file_path(symbol, years, stamp, output_format)
+            df = None if force else load_saved_data(file_path, output_format)
+        except Exception as e:
+            results.append((symbol, None, str(e)))
+            continue
+        if df is None:
+            pending[symbol] = file_path
+        else:
+            results.append((symbol, df, None))
             
-            print(f"\nDate range: {df['Date'].min()} to {df['Date'].max()}")
-            print(f"Total number of trading days: {len(df)}")  # Changed weeks to trading days
+    if not pending:
+        return results
+        
+    try:
+        frames, errors = download_candlestick_data(list(pending), start_str, end_str)
+    except Exception as e:
+        results.extend((symbol, None, str(e)) for symbol in pending)
+        return results
+        
+    for symbol, file_path in pending.items():
+        if symbol in errors:
+            results.append((symbol, None, errors[symbol]))
+            continue
+        try:
+            df = save_candlestick_data(frames.get(symbol), symbol, file_path, output_format)
+            results.append((symbol, df, None))
+        except Exception as e:
+            results.append((symbol, None, str(e)))
+    return results
 
 def main():
     parser = argparse.ArgumentParser(description='NSE Stock Data Downloader - Daily Candlestick Data')  # Updated description
     parser.add_argument('symbols', nargs='+', help='One or more stock symbols (e.g., TATAMOTORS RELIANCE TCS)')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='parquet',
+                        help='Output file format (default: parquet)')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Number of batches processed in parallel (default: 8)')
+    parser.add_argument('--force', action='store_true',
+                        help="Download again even if today's file already exists")
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print a preview and summary statistics for each symbol')
     args = parser.parse_args()
 
     try:
-        downloader = NSEDataDownloader()
-        
-        for symbol in args.symbols:
-            try:
-                print("\n" + "="*50)
-                nse_symbol, base_symbol = downloader.validate_symbol(symbol)
-                df = downloader.download_candlestick_data(nse_symbol, base_symbol)
-                downloader.display_data_summary(df, base_symbol)
-                print("="*50 + "\n")
-            except Exception as e:
-                print(f"Error processing {symbol}: {str(e)}")
-                continue
+        symbols = [symbol.upper() for symbol in args.symbols]
+        start_str, end_str, stamp = get_date_range(YEARS)
+        process_batch = functools.partial(
+            _process_batch,
+            years=YEARS,
+            start_str=start_str,
+            end_str=end_str,
+            stamp=stamp,
+            output_format=args.format,
+            force=args.force
+        )
+        
+        batches = [
+            symbols[start:start + BATCH_SIZE]
+            for start in range(0, len(symbols), BATCH_SIZE)
+        ]
+        
+        # Saving one batch overlaps with downloading the next
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(process_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                for symbol, df, error in future.result():
+                    if error:
+                        print(f"Error processing {symbol}: {error}")
+                        continue
+                    if not args.verbose:
+                        continue
+                    print("\n" + "="*50)
+                    display_data_summary(df, symbol)
+                    print("="*50 + "\n")
 
     except KeyboardInterrupt:
         print("\nProgram terminated by user.")
@@ -1,41 +1,81 @@
 from breeze_connect import BreezeConnect
-
-# Initialize SDK
-breeze = BreezeConnect(api_key="Q8h2250667_3783&075)iY55K73276#3")
-
-# Obtain your session key from https://api.icicidirect.com/apiuser/login?api_key=YOUR_API_KEY
-# Incase your api-key has special characters(like +,=,!) then encode the api key before using in the url as shown below.
-import urllib
-print("https://api.icicidirect.com/apiuser/login?api_key="+urllib.parse.quote_plus("Q8h2250667_3783&075)iY55K73276#3"))
-
-# Generate Session
-breeze.generate_session(api_secret="^O57155529d~o1tJbHf973V907276B83",
-                        session_token="47417053")
-
-# Generate ISO8601 Date/DateTime String
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import os
+import urllib.parse
 import datetime
-iso_date_string = datetime.datetime.strptime("28/02/2021","%d/%m/%Y").isoformat()[:10] + 'T05:30:00.000Z'
-iso_date_time_string = datetime.datetime.strptime("28/02/2021 23:59:59","%d/%m/%Y %H:%M:%S").isoformat()[:19] + '.000Z'
+import pandas as pd
 
-# Connect to websocket(it will connect to tick-by-tick data server)
-breeze.ws_connect()
+# Initialize SDK once per process with credentials from the environment:
+# BREEZE_API_KEY, BREEZE_API_SECRET and BREEZE_SESSION_TOKEN
+@lru_cache(maxsize=1)
+def get_breeze():
+    breeze = BreezeConnect(api_key=os.environ['BREEZE_API_KEY'])
+
+    # Generate Session
+    breeze.generate_session(api_secret=os.environ['BREEZE_API_SECRET'],
+                            session_token=os.environ['BREEZE_SESSION_TOKEN'])
+    return breeze
 
 # Callback to receive ticks.
 def on_ticks(ticks):
     print("Ticks: {}".format(ticks))
 
-# Assign the callbacks.
-breeze.on_ticks = on_ticks
+# Fetch historical candles one day per request, with the days requested concurrently.
+# The API caps how much 1-minute data one call returns, so long windows need chunking anyway.
+def fetch_historical_data(stock_code, from_date, to_date, interval="1minute",
+                          exchange_code="NSE", product_type="cash", max_workers=8):
+    breeze = get_breeze()
+    start = pd.Timestamp(from_date)
+    end = pd.Timestamp(to_date)
+
+    def fetch_chunk(chunk_start):
+        chunk_end = min(chunk_start + pd.Timedelta(days=1), end)
+        chunk = breeze.get_historical_data_v2(interval=interval,
+                            from_date=chunk_start.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                            to_date=chunk_end.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                            stock_code=stock_code,
+                            exchange_code=exchange_code,
+                            product_type=product_type)
+        if chunk.get("Error"):
+            print(f"Error fetching {stock_code} from {chunk_start} to {chunk_end}: {chunk['Error']}")
+        return pd.DataFrame(chunk.get("Success") or [])
+
+    chunk_starts = [day for day in pd.date_range(start, end, freq='D') if day < end]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(fetch_chunk, chunk_starts))
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+
+    # Neighbouring chunks share their boundary, so the candle at each boundary comes back twice
+    if 'datetime' in df.columns:
+        df = df.drop_duplicates(subset='datetime', ignore_index=True)
+    return df
+
+if __name__ == "__main__":
+    # Obtain your session key from https://api.icicidirect.com/apiuser/login?api_key=YOUR_API_KEY
+    # Incase your api-key has special characters(like +,=,!) then encode the api key before using in the url as shown below.
+    print("https://api.icicidirect.com/apiuser/login?api_key="+urllib.parse.quote_plus(os.environ['BREEZE_API_KEY']))
+
+    breeze = get_breeze()
+
+    # Generate ISO8601 Date/DateTime String
+    iso_date_string = datetime.datetime.strptime("28/02/2021","%d/%m/%Y").isoformat()[:10] + 'T05:30:00.000Z'
+    iso_date_time_string = datetime.datetime.strptime("28/02/2021 23:59:59","%d/%m/%Y %H:%M:%S").isoformat()[:19] + '.000Z'
+
+    # Connect to websocket(it will connect to tick-by-tick data server)
+    breeze.ws_connect()
+
+    # Assign the callbacks.
+    breeze.on_ticks = on_ticks
 
-reponse = breeze.get_historical_data_v2(interval="1minute",
-                            from_date= "2024-09-15T07:00:00.000Z",
-                            to_date= "2024-09-17T07:00:00.000Z",
-                            stock_code="ITC",
-                            exchange_code="NSE",
-                            product_type="cash")
+    reponse = fetch_historical_data(stock_code="ITC",
+                                    from_date="2024-09-15T07:00:00.000Z",
+                                    to_date="2024-09-17T07:00:00.000Z")
 
-response = breeze.get_demat_holdings()
-#print(response)
+    response = breeze.get_demat_holdings()
+    #print(response)
 
-# subscribe oneclick strategy stream
-breeze.subscribe_feeds(stock_code = "ITC", exchange_code = "NSE", product_type = "cash")
\ No newline at end of file
+    # subscribe oneclick strategy stream
+    breeze.subscribe_feeds(stock_code = "ITC", exchange_code = "NSE", product_type = "cash")
@@ -1,6 +1,12 @@
+import re
 import subprocess
 import sys
-import time
+import tempfile
+import threading
+
+# Symbols are plain alphanumeric tickers
+_SYM_RE = re.compile(r'^[A-Za-z0-9]+\Z')
+_MAX_SYMBOL_LENGTH = 32
 
 def validate_symbol(symbol):
     """
@@ -16,43 +22,88 @@ def validate_symbol(symbol):
         raise ValueError("Company symbol cannot be empty")
         
     symbol = symbol.strip().upper()
-    if not symbol.isalnum():
+    if len(symbol) > _MAX_SYMBOL_LENGTH:
+        raise ValueError(f"Company symbol cannot be longer than {_MAX_SYMBOL_LENGTH} characters")
+    if not _SYM_RE.match(symbol):
         raise ValueError("Company symbol should only contain letters and numbers")
         
     return symbol
 
-def execute_script(script_name, symbol):
+def _stream_output(script_name, stream):
+    """
+    Echo a child's stdout line by line as it arrives
+    
+    Parameters:
+    script_name (str): Name of the script, used to prefix each line
+    stream (file): The child's stdout pipe
+    """
+    with stream:
+        for line in stream:
+            sys.stdout.write(f"[{script_name}] {line}")
+
+def start_script(script_name, symbol):
     """
-    Execute a Python script with the given symbol argument
+    Launch a Python script with the given symbol argument without waiting for it
     
     Parameters:
     script_name (str): Name of the script to execute
     symbol (str): Company symbol to pass as argument
     
     Returns:
-    bool: True if execution was successful, False otherwise
+    tuple: (process, stdout reader thread, stderr file), or None if it could not be started
     """
     try:
         print(f"\nExecuting {script_name} for {symbol}...")
-        result = subprocess.run(
-            [sys.executable, script_name, symbol],
-            capture_output=True,
+        # stderr is spooled to a temp file so only stdout needs a reader; -u stops
+        # the child block-buffering print output into the pipe until it exits
+        stderr_file = tempfile.TemporaryFile(mode='w+')
+        proc = subprocess.Popen(
+            [sys.executable, '-u', script_name, symbol],
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
             text=True,
-            check=True
+            bufsize=1
         )
-        print(f"Output from {script_name}:")
-        print(result.stdout)
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing {script_name}:")
-        print(f"Exit code: {e.returncode}")
-        print(f"Error output: {e.stderr}")
-        return False
+        reader = threading.Thread(target=_stream_output, args=(script_name, proc.stdout), daemon=True)
+        reader.start()
+        return proc, reader, stderr_file
         
     except Exception as e:
         print(f"Unexpected error executing {script_name}: {str(e)}")
+        return None
+
+def wait_for_script(script_name, handle):
+    """
+    Wait for a script started by start_script and report how it finished
+    
+    Parameters:
+    script_name (str): Name of the script that was executed
+    handle (tuple): Value returned by start_script
+    
+    Returns:
+    bool: True if execution was successful, False otherwise
+    """
+    if handle is None:
         return False
+        
+    proc, reader, stderr_file = handle
+    with stderr_file:
+        try:
+            returncode = proc.wait()
+            reader.join()
+        except Exception as e:
+            print(f"Unexpected error executing {script_name}: {str(e)}")
+            return False
+            
+        if returncode != 0:
+            stderr_file.seek(0)
+            print(f"Error executing {script_name}:")
+            print(f"Exit code: {returncode}")
+            print(f"Error output: {stderr_file.read()}")
+            return False
+            
+    print(f"{script_name} completed successfully")
+    return True
 
 def main():
     print("Company Analysis Tool")
@@ -77,12 +128,12 @@ def main():
                 'download_candledata_in_folder.py'
             ]
             
-            # Execute each script
+            # Scripts are independent, so start them all before waiting on any
+            handles = [(script, start_script(script, symbol)) for script in scripts]
             success_count = 0
-            for script in scripts:
-                if execute_script(script, symbol):
+            for script, handle in handles:
+                if wait_for_script(script, handle):
                     success_count += 1
-                time.sleep(1)  # Add small delay between scripts
             
             # Report overall status
             if success_count == len(scripts):